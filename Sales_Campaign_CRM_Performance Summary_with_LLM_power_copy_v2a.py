@@ -1,18 +1,32 @@
 
 import pandas as pd
+import numpy as np
 import re
-import random
 import time
 import os
 import logging
-import concurrent.futures
+import logging.handlers
+import atexit
+import queue
+import json
+import hashlib
+import shelve
+import csv
+import io
+import threading
+import asyncio
+import aiohttp
 import requests
 import smtplib
 
-from openai import OpenAI
+from functools import lru_cache
+from openai import OpenAI, OpenAIError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from email.policy import SMTP as SMTP_POLICY
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from googleapiclient.discovery import build
 from google.oauth2 import service_account
 
@@ -28,9 +42,19 @@ SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 
-# Configure logging for debugging and tracking process execution
-logging.basicConfig(filename='sales_campaign.log', level=logging.DEBUG,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+# Configure logging for debugging and tracking process execution.
+# Records are queued by the caller and written to the log file by a background listener thread.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+_log_queue = queue.Queue(-1)
+_log_file_handler = logging.FileHandler('sales_campaign.log')
+_log_file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_file_handler)
+# The QueueHandler gets no formatter of its own, so records reach the file handler with the bare message
+_root_logger = logging.getLogger()
+_root_logger.setLevel(LOG_LEVEL)
+_root_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 
 
@@ -39,68 +63,298 @@ SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
 SERVICE_ACCOUNT_FILE = "service_account.json"
 SPREADSHEET_ID = os.getenv("google_sheets_id")
 
+# Columns updated by the agents; only these cells are written back to the sheet
+STATUS_COLUMNS = ['Email Verified', 'Response Status']
+EMAIL_VERIFIED_DTYPE = pd.CategoricalDtype(['Y', 'N'])
+RESPONSE_STATUS_DTYPE = pd.CategoricalDtype(['Interested', 'Not Interested'])
+
 
 # Configurable scheduling interval with dynamic adjustment
 SCHEDULER_INTERVAL_HOURS = int(os.getenv("SCHEDULER_INTERVAL_HOURS", 1))
 
-def read_google_sheets():
-    """Reads lead data from Google Sheets into a DataFrame."""
+# Upper bound on simultaneous NeverBounce connections during verification
+NEVERBOUNCE_MAX_CONNECTIONS = int(os.getenv("NEVERBOUNCE_MAX_CONNECTIONS", 100))
+
+# Lead count at which verification switches from single checks to one NeverBounce bulk job
+NEVERBOUNCE_BULK_THRESHOLD = int(os.getenv("NEVERBOUNCE_BULK_THRESHOLD", 50))
+NEVERBOUNCE_JOB_POLL_SECONDS = 5
+NEVERBOUNCE_JOB_TIMEOUT_SECONDS = int(os.getenv("NEVERBOUNCE_JOB_TIMEOUT_SECONDS", 900))
+
+# Syntactic pre-check so malformed addresses never reach NeverBounce
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Persistent cache of NeverBounce results so recurring leads skip the API between runs
+VERIFY_CACHE_FILE = "nb_cache"
+VERIFY_CACHE_TTL_SECONDS = int(os.getenv("VERIFY_CACHE_TTL_SECONDS", 7 * 86400))
+_verify_cache = None
+_verify_cache_lock = threading.Lock()
+_verify_cache_stats = {"hits": 0, "misses": 0}
+
+# Retry policy for NeverBounce calls: rate limiting and transient server errors are retried with backoff
+NEVERBOUNCE_MAX_RETRIES = 3
+NEVERBOUNCE_BACKOFF_FACTOR = 0.5
+NEVERBOUNCE_RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+# Shared keep-alive session for the NeverBounce bulk job endpoints; retries are handled by urllib3
+_NB_SESSION = requests.Session()
+_NB_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=32, pool_maxsize=32,
+    max_retries=Retry(total=NEVERBOUNCE_MAX_RETRIES, backoff_factor=NEVERBOUNCE_BACKOFF_FACTOR,
+                      status_forcelist=NEVERBOUNCE_RETRY_STATUSES)))
+
+# LLM settings; the static prompt prefix is kept first so it can be served from OpenAI's prompt cache
+OPENAI_MODEL = "gpt-4o-mini"
+# max_tokens is one budget for the whole JSON answer: about 200 tokens per field plus JSON overhead.
+# The system prompt caps each field's length so replies fit; truncated replies are rejected, never cached.
+LLM_MAX_TOKENS = 450
+LLM_UNAVAILABLE_TEXT = "Not available for this run (the LLM request failed)."
+LLM_SYSTEM_PROMPT = """
+You analyse sales campaign performance. The user message contains the campaign data:
+total leads, verified leads and interested leads.
+Respond with a JSON object containing two string fields:
+- "insights": concise insights on the campaign performance, including trends, patterns, and areas for improvement.
+- "recommendations": concise, actionable recommendations to improve the campaign performance, focusing on increasing engagement and conversion rates.
+Keep each field under 120 words.
+"""
+
+# Persistent cache of LLM responses keyed by a fingerprint of the campaign counters
+LLM_CACHE_FILE = "llm_cache"
+_llm_cache_lock = threading.Lock()
+
+@lru_cache(maxsize=1)
+def _sheet():
+    """Builds the authorized Sheets client once and reuses it across scheduled runs."""
     creds = service_account.Credentials.from_service_account_file(
         SERVICE_ACCOUNT_FILE, scopes=SCOPES)
-    service = build('sheets', 'v4', credentials=creds)
-    sheet = service.spreadsheets()
-    result = sheet.values().get(spreadsheetId=SPREADSHEET_ID, range="Sheet1").execute()
+    service = build('sheets', 'v4', credentials=creds, cache_discovery=False)
+    return service.spreadsheets()
+
+def read_google_sheets():
+    """Reads lead data from Google Sheets into a DataFrame."""
+    sheet = _sheet()
+    result = sheet.values().get(spreadsheetId=SPREADSHEET_ID, range="Sheet1",
+                                valueRenderOption="UNFORMATTED_VALUE", majorDimension="ROWS").execute()
     values = result.get('values', [])
     if not values:
         logging.warning("No data found in Google Sheets.")
         return pd.DataFrame()
-    df = pd.DataFrame(values[1:], columns=values[0])
+    # The API omits trailing empty cells, so pad every row to the header width
+    header = values[0]
+    width = len(header)
+    rows = [(row + [''] * width)[:width] for row in values[1:]]
+    df = pd.DataFrame(rows, columns=header)
     logging.info("Successfully fetched data from Google Sheets.")
     return df
 
-def write_google_sheets(df):
-    """Writes updated lead data back to Google Sheets."""
-    creds = service_account.Credentials.from_service_account_file(
-        SERVICE_ACCOUNT_FILE, scopes=SCOPES)
-    service = build('sheets', 'v4', credentials=creds)
-    sheet = service.spreadsheets()
-    body = {'values': [df.columns.tolist()] + df.values.tolist()}
-    sheet.values().update(spreadsheetId=SPREADSHEET_ID, range="Sheet1",
-                          valueInputOption="RAW", body=body).execute()
-    logging.info("Successfully updated Google Sheets with modified rows.")
-
-def agent_a_verify_leads(df):
+def _unprocessed_leads(df):
+    """Returns the leads whose Email Verified cell is still blank, keeping their sheet row index."""
+    if 'Email Verified' not in df.columns:
+        return df.copy()
+    verified = df['Email Verified']
+    return df[verified.isna() | (verified.astype(str).str.strip() == '')].copy()
+
+def _column_letter(position):
+    """Converts a zero-based column position into its A1 notation letter (0 -> A, 26 -> AA)."""
+    letters = ""
+    position += 1
+    while position:
+        position, remainder = divmod(position - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+def write_google_sheets(df, dirty_idx=None, cols=None):
+    """
+    Writes updated lead data back to Google Sheets.
+    With dirty_idx and cols, only those cells (plus their column headers) are sent in one batchUpdate;
+    otherwise the whole sheet is overwritten. Index labels are the zero-based data rows of the sheet.
+    """
+    sheet = _sheet()
+    if dirty_idx is None or cols is None:
+        body = {'values': [df.columns.tolist()] + df.values.tolist()}
+        sheet.values().update(spreadsheetId=SPREADSHEET_ID, range="Sheet1",
+                              valueInputOption="RAW", body=body).execute()
+        logging.info("Successfully updated Google Sheets with all rows.")
+        return
+    if len(dirty_idx) == 0:
+        logging.info("No modified rows to write to Google Sheets.")
+        return
+
+    letters = {col: _column_letter(df.columns.get_loc(col)) for col in cols}
+    data = [{"range": f"Sheet1!{letters[col]}1", "values": [[col]]} for col in cols]
+    for i in dirty_idx:
+        for col in cols:
+            value = df.at[i, col]
+            data.append({"range": f"Sheet1!{letters[col]}{i+2}",
+                         "values": [["" if pd.isna(value) else value]]})
+    sheet.values().batchUpdate(spreadsheetId=SPREADSHEET_ID,
+                               body={"valueInputOption": "RAW", "data": data}).execute()
+    logging.info("Successfully updated Google Sheets with %d modified rows.", len(dirty_idx))
+
+async def agent_a_verify_leads(df):
     """Agent A verifies lead emails using NeverBounce."""
     if df.empty or 'Email' not in df.columns:
         logging.warning("No leads available for verification.")
         return df
     if 'Email Verified' not in df.columns:
         df['Email Verified'] = pd.Series(pd.NA, index=df.index)
-    logging.debug("Starting email verification process using parallel execution.")
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        results = list(executor.map(verify_email_neverbounce, df['Email']))
-    df['Email Verified'] = ['Y' if res else 'N' for res in results]
-    logging.info(f"Email verification completed: {df['Email Verified'].value_counts().to_dict()}")
-    return df
 
-def verify_email_neverbounce(email):
-    """Validates an email using the NeverBounce API."""
-    if not NEVERBOUNCE_API_KEY:
+    async def _run(emails):
+        connector = aiohttp.TCPConnector(limit=NEVERBOUNCE_MAX_CONNECTIONS)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            return await asyncio.gather(*[verify_email_async(session, email) for email in emails])
+
+    _verify_cache_stats.update(hits=0, misses=0)
+    # Resolve each distinct address once: malformed and cached ones never reach NeverBounce
+    normalized = df['Email'].map(_normalize_email)
+    unique_emails = normalized.drop_duplicates()
+    lookup = {}
+    pending = []
+    for email in unique_emails:
+        if not _EMAIL_RE.match(email):
+            lookup[email] = False
+            continue
+        cached = _cached_verification(email)
+        if cached is None:
+            pending.append(email)
+        else:
+            lookup[email] = cached
+
+    # Choose between a bulk job and single checks based on the addresses that still need the API
+    results = None
+    if pending and not NEVERBOUNCE_API_KEY:
         logging.error("NeverBounce API Key is missing. Email verification cannot proceed.")
-        return False
+        results = {}
+    elif len(pending) >= NEVERBOUNCE_BULK_THRESHOLD:
+        logging.debug("Starting email verification process using a NeverBounce bulk job.")
+        results = await asyncio.to_thread(verify_emails_bulk, pending)
+        if results is None:
+            logging.warning("NeverBounce bulk job failed; falling back to single email checks.")
+    if results is None and pending:
+        logging.debug("Starting email verification process using concurrent async requests.")
+        results = dict(zip(pending, await _run(pending)))
+    lookup.update(results or {})
+    _get_verify_cache().sync()
+
+    # Leads whose check came back unknown (API errors, missing key) stay blank so the next run retries them
+    flags = pd.Series(pd.NA, index=df.index, dtype=EMAIL_VERIFIED_DTYPE)
+    flags[normalized.isin([email for email, result in lookup.items() if result is True])] = 'Y'
+    flags[normalized.isin([email for email, result in lookup.items() if result is False])] = 'N'
+    df['Email Verified'] = flags
+    logging.info("Sent %d of %d unique emails to NeverBounce for %d leads.",
+                 len(pending), len(unique_emails), len(df))
+    if flags.isna().any():
+        logging.warning("Verification result unknown for %d leads; they will be retried next run.",
+                        int(flags.isna().sum()))
+    logging.info("Email verification completed: %s", df['Email Verified'].value_counts().to_dict())
+    logging.info("Verification cache stats: %s", _verify_cache_stats)
+    return df
+
+def _get_verify_cache():
+    """Opens the on-disk verification cache on first use."""
+    global _verify_cache
+    with _verify_cache_lock:
+        if _verify_cache is None:
+            _verify_cache = shelve.open(VERIFY_CACHE_FILE)
+        return _verify_cache
+
+def _normalize_email(email):
+    """Normalizes an email address for use as a cache key and API input."""
+    return email.strip().lower() if isinstance(email, str) else ""
+
+def _cached_verification(email):
+    """Returns the cached result for an email, or None when absent or expired."""
+    cache = _get_verify_cache()
+    with _verify_cache_lock:
+        entry = cache.get(email)
+        if entry is not None and time.time() - entry[0] < VERIFY_CACHE_TTL_SECONDS:
+            _verify_cache_stats["hits"] += 1
+            return entry[1]
+        _verify_cache_stats["misses"] += 1
+    return None
+
+def _store_verification(email, result):
+    """Records a NeverBounce result in the verification cache."""
+    cache = _get_verify_cache()
+    with _verify_cache_lock:
+        cache[email] = (time.time(), result)
+
+def verify_emails_bulk(emails):
+    """
+    Validates a batch of normalized, well-formed emails with a single NeverBounce bulk job.
+    Returns a dictionary mapping each email found in the job output to its result,
+    or None if the job did not complete.
+    """
+    results = {}
+    url = "https://api.neverbounce.com/v4/jobs"
+    try:
+        response = _NB_SESSION.post(f"{url}/create", json={
+            "key": NEVERBOUNCE_API_KEY,
+            "input_location": "supplied",
+            "input": [{"email": email} for email in emails],
+            "auto_parse": True,
+            "auto_start": True,
+        }, timeout=30)
+        response.raise_for_status()
+        job = response.json()
+        if job.get("status") != "success" or "job_id" not in job:
+            logging.warning("Unexpected API response: %s", job)
+            return None
+        params = {"key": NEVERBOUNCE_API_KEY, "job_id": job["job_id"]}
+
+        deadline = time.monotonic() + NEVERBOUNCE_JOB_TIMEOUT_SECONDS
+        while True:
+            response = _NB_SESSION.get(f"{url}/status", params=params, timeout=10)
+            response.raise_for_status()
+            job_status = response.json().get("job_status")
+            if job_status == "complete":
+                break
+            if job_status == "failed" or time.monotonic() > deadline:
+                logging.warning("NeverBounce job %s did not complete (status: %s).", job['job_id'], job_status)
+                return None
+            time.sleep(NEVERBOUNCE_JOB_POLL_SECONDS)
+
+        response = _NB_SESSION.get(f"{url}/download", params={**params, "email_status": 1}, timeout=60)
+        response.raise_for_status()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logging.exception("NeverBounce bulk email verification failed: %s", e)
+        return None
+
+    # Each CSV row starts with the submitted email and ends with the appended email status
+    submitted = set(emails)
+    for row in csv.reader(io.StringIO(response.text)):
+        email = _normalize_email(row[0]) if row else ""
+        if email in submitted:
+            results[email] = row[-1].strip().lower() == "valid"
+            _store_verification(email, results[email])
+    return results
+
+async def verify_email_async(session, email):
+    """
+    Validates a normalized, well-formed email using the NeverBounce API on a shared aiohttp session.
+    Returns True or False for a definitive answer, or None when the check could not be completed.
+    """
     url = "https://api.neverbounce.com/v4/single/check"
     params = {"key": NEVERBOUNCE_API_KEY, "email": email}
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        if not isinstance(data, dict) or "result" not in data:
-            logging.warning(f"Unexpected API response: {data}")
-            return False
-        return data.get("result", "") == "valid"
-    except requests.exceptions.RequestException as e:
-        logging.exception(f"NeverBounce API email verification failed for {email}: {e}")
-        return False
+        for attempt in range(NEVERBOUNCE_MAX_RETRIES + 1):
+            async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                # Back off on rate limiting and transient server errors, like the urllib3 Retry on _NB_SESSION
+                if response.status in NEVERBOUNCE_RETRY_STATUSES and attempt < NEVERBOUNCE_MAX_RETRIES:
+                    await asyncio.sleep(NEVERBOUNCE_BACKOFF_FACTOR * 2 ** attempt)
+                    continue
+                response.raise_for_status()
+                data = await response.json()
+                break
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        logging.exception("NeverBounce API email verification failed for %s: %s", email, e)
+        return None
+    if not isinstance(data, dict) or "result" not in data:
+        logging.warning("Unexpected API response: %s", data)
+        return None
+    result = data.get("result", "") == "valid"
+    logging.debug("Verified %s: %s", email, result)
+    _store_verification(email, result)
+    return result
 
 
 
@@ -112,8 +366,8 @@ def consolidate_results(df):
     Returns a dictionary with total leads, verified leads, interested leads, insights, and recommendations.
     """
     total_leads = len(df)
-    verified_leads = len(df[df['Email Verified'] == 'Y'])
-    interested_leads = len(df[df['Response Status'] == 'Interested'])
+    verified_leads = int(df['Email Verified'].value_counts().get('Y', 0))
+    interested_leads = int(df['Response Status'].value_counts().get('Interested', 0))
 
     # Basic summary
     summary = {
@@ -122,149 +376,215 @@ def consolidate_results(df):
         'Interested Leads': interested_leads
     }
 
-    # Generate insights using LLM
-    insights = generate_insights(df)
-    recommendations = generate_recommendations(df)
+    # Generate insights and recommendations using a single LLM call
+    insights, recommendations = generate_insights_and_recs(total_leads, verified_leads, interested_leads)
 
     # Combine summary, insights, and recommendations
     summary['Insights'] = insights
     summary['Recommendations'] = recommendations
 
-    logging.info(f"Campaign Summary: {summary}")
+    logging.info("Campaign Summary: %s", summary)
     return summary
 
-def generate_insights(df):
+def _llm_cache_key(kind, total_leads, verified_leads, interested_leads):
     """
-    Generates insights based on the campaign data using LLM.
+    Fingerprints an LLM request by its kind, the campaign counters it depends on, the model and the system prompt.
+    Changing the model or the prompt therefore never serves answers cached for the old ones.
     """
-    total_leads = len(df)
-    verified_leads = len(df[df['Email Verified'] == 'Y'])
-    interested_leads = len(df[df['Response Status'] == 'Interested'])
+    prompt_hash = hashlib.sha256(LLM_SYSTEM_PROMPT.encode("utf-8")).hexdigest()
+    payload = json.dumps({"t": total_leads, "v": verified_leads, "i": interested_leads, "kind": kind,
+                          "model": OPENAI_MODEL, "prompt": prompt_hash}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _as_text(value):
+    """Flattens a JSON field from the LLM response into plain text."""
+    if isinstance(value, list):
+        return "\n".join(str(item) for item in value)
+    return str(value or "").strip()
+
+@lru_cache(maxsize=512)
+def _insights_and_recs_cached(total_leads, verified_leads, interested_leads):
+    """
+    Generates insights and recommendations for the given campaign counters in a single LLM call.
+    Memoized per process, and persisted on disk so restarts reuse earlier responses.
+    """
+    key = _llm_cache_key("insights_and_recommendations", total_leads, verified_leads, interested_leads)
+    with _llm_cache_lock, shelve.open(LLM_CACHE_FILE) as cache:
+        if key in cache:
+            logging.info("LLM cache hit for insights and recommendations.")
+            return cache[key]
 
-    # Example prompt for LLM
+    # Only the campaign counters vary between runs; the static instructions live in the system prompt
     prompt = f"""
-    Based on the following campaign data:
     - Total Leads: {total_leads}
     - Verified Leads: {verified_leads}
     - Interested Leads: {interested_leads}
-    Provide detailed insights on the campaign performance, including trends, patterns, and areas for improvement.
     """
 
-    # Call OpenAI API to generate recommendations
+    # Call OpenAI API to generate insights and recommendations together
     client = OpenAI(api_key=OPENAI_API_KEY)
-    response = client.Completion.create(
-        prompt=prompt,
-        max_tokens=300
+    response = client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": LLM_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ],
+        response_format={"type": "json_object"},
+        max_tokens=LLM_MAX_TOKENS,
+        stream=False
     )
+    # Failures raise instead of returning, so lru_cache and the disk cache only keep good answers
+    choice = response.choices[0]
+    if choice.finish_reason == "length":
+        raise ValueError(f"LLM response was truncated at max_tokens={LLM_MAX_TOKENS}")
+    data = json.loads(choice.message.content or "")
+    if not isinstance(data, dict):
+        raise ValueError(f"Unexpected LLM response: {data!r}")
+    result = (_as_text(data.get("insights")), _as_text(data.get("recommendations")))
+
+    with _llm_cache_lock, shelve.open(LLM_CACHE_FILE) as cache:
+        cache[key] = result
+    return result
+
+def generate_insights_and_recs(total_leads, verified_leads, interested_leads):
+    """
+    Generates insights and recommendations based on the campaign counters using one LLM call.
+    Returns a tuple of (insights, recommendations).
+    """
+    try:
+        insights, recommendations = _insights_and_recs_cached(total_leads, verified_leads, interested_leads)
+    except (OpenAIError, ValueError) as e:
+        logging.exception("Insights and recommendations could not be generated: %s", e)
+        insights = recommendations = LLM_UNAVAILABLE_TEXT
+    logging.info("Generated Insights: %s", insights)
+    logging.info("Generated Recommendations: %s", recommendations)
+    return insights, recommendations
+
+
+
+def _build_mime(email_body):
+    """Builds the campaign summary email and returns it as CRLF-terminated bytes ready for sendmail."""
+    msg = MIMEMultipart()
+    msg['From'] = SMTP_USER_SENDER
+    msg['To'] = SMTP_USER_RECIEVER
+    msg['Subject'] = "Campaign Performance Summary Report with Insights and Recommendations"
+    msg.attach(MIMEText(email_body, 'plain'))
+    return msg.as_bytes(policy=SMTP_POLICY)
+
+def _open_smtp():
+    """Opens an authenticated SMTP connection."""
+    server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
+    server.starttls()
+    server.login(SMTP_USER_SENDER, SMTP_PASSWORD)
+    return server
+
+def _close_smtp(server):
+    """Closes an SMTP connection, ignoring errors from connections that already dropped."""
+    if server is None:
+        return
+    try:
+        server.quit()
+    except (smtplib.SMTPException, OSError):
+        server.close()
 
+def send_summary_email(df):
+    """Sends the campaign summary email to stakeholders once per run, with retry mechanism."""
+    # Apply consolidate_results to the DataFrame
+    summary = consolidate_results(df)
 
-    insights = response.choices[0].text.strip()
-    logging.info(f"Generated Insights: {insights}")
-    return insights
+    # Format the summary for email
+    email_body = f"""
+    Dear Stakeholders,
 
-def generate_recommendations(df):
-    """
-    Generates recommendations based on the campaign data using LLM.
-    """
-    total_leads = len(df)
-    verified_leads = len(df[df['Email Verified'] == 'Y'])
-    interested_leads = len(df[df['Response Status'] == 'Interested'])
+    Here is the summary of our recent campaign performance:
 
-    # Example prompt for LLM
-    prompt = f"""
-    Based on the following campaign data:
-    - Total Leads: {total_leads}
-    - Verified Leads: {verified_leads}
-    - Interested Leads: {interested_leads}
-    Provide actionable recommendations to improve the campaign performance, focusing on increasing engagement and conversion rates.
-    """
+    Total Leads: {summary['Total Leads']}
+    Verified Leads: {summary['Verified Leads']}
+    Interested Leads: {summary['Interested Leads']}
 
-    # Call OpenAI API to generate recommendations
-    client = OpenAI(api_key=OPENAI_API_KEY)
-    response = client.Completion.create(
-        prompt=prompt,
-        max_tokens=300
-    )
+    Insights:
+    {summary['Insights']}
 
-    recommendations = response.choices[0].text.strip()
-    logging.info(f"Generated Recommendations: {recommendations}")
-    return recommendations
+    Recommendations:
+    {summary['Recommendations']}
 
+    Best regards,
+    Chief Lead Generation Specialist
 
+    """
+    payload = _build_mime(email_body)
 
-def agent_b_outreach(df):
-    """Agent B sends outreach emails using SMTP."""
-    def send_email_smtp(lead):
-        """Sends email using SMTP with retry mechanism."""
+    for attempt in range(3):
+        server = None
         try:
-            msg = MIMEMultipart()
-            msg['From'] = SMTP_USER_SENDER
-            msg['To'] = SMTP_USER_RECIEVER
-            msg['Subject'] = "Campaign Performance Summary Report with Insights and Recommendations"
-            # Apply consolidate_results to the DataFrame
-            summary = consolidate_results(df)
-
-            # Format the summary for email
-            email_body = f"""
-            Dear Stakeholders,
-
-            Here is the summary of our recent campaign performance:
-
-            Total Leads: {summary['Total Leads']}
-            Verified Leads: {summary['Verified Leads']}
-            Interested Leads: {summary['Interested Leads']}
-
-            Insights:
-            {summary['Insights']}
-
-            Recommendations:
-            {summary['Recommendations']}
-
-            Best regards,
-            Chief Lead Generation Specialist
-
-            """
-
-            msg.attach(MIMEText(email_body, 'plain'))
-            server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-            server.starttls()
-            server.login(SMTP_USER_SENDER, SMTP_PASSWORD)
-            for attempt in range(3):
-                try:
-                    server.sendmail(SMTP_USER_SENDER, SMTP_USER_RECIEVER, msg.as_string())
-                    server.quit()
-                    return 'Interested' if random.random() > 0.5 else 'Not Interested'
-                except Exception as e:
-                    logging.warning(f"SMTP email sending failed (Attempt {attempt+1}/3): {e}")
-                    time.sleep(2)
-            return 'Failed'
+            server = _open_smtp()
+            server.sendmail(SMTP_USER_SENDER, SMTP_USER_RECIEVER, payload)
+            logging.info("Campaign summary email sent successfully.")
+            return True
         except Exception as e:
-            logging.exception(f"SMTP setup failed: {e}")
-            return 'Failed'
-    
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        df['Response Status'] = list(executor.map(send_email_smtp, df.to_dict('records')))
+            logging.warning("SMTP email sending failed (Attempt %d/3): %s", attempt + 1, e)
+            time.sleep(2)
+        finally:
+            _close_smtp(server)
+    logging.error("Campaign summary email could not be sent.")
+    return False
+
+def agent_b_outreach(df):
+    """Agent B records the simulated outreach response for each lead."""
+    df['Response Status'] = pd.Categorical(
+        np.where(np.random.random(len(df)) > 0.5, 'Interested', 'Not Interested'), dtype=RESPONSE_STATUS_DTYPE)
+    logging.info("Outreach completed: %s", df['Response Status'].value_counts().to_dict())
     return df
 
-def scheduled_task():
+async def scheduled_task():
     """Scheduled task to automate lead processing at configurable intervals."""
     logging.debug("Scheduled task initiated.")
     try:
-        leads_df = read_google_sheets()
+        # Blocking client calls run in worker threads so the event loop stays free
+        leads_df = await asyncio.to_thread(read_google_sheets)
         if leads_df.empty:
             logging.warning("No valid leads found in Google Sheets. Exiting.")
             return
-        leads_df = agent_a_verify_leads(leads_df)
-        leads_df = agent_b_outreach(leads_df)
-        write_google_sheets(leads_df)
+        for col in STATUS_COLUMNS:
+            if col not in leads_df.columns:
+                leads_df[col] = pd.Series(pd.NA, index=leads_df.index, dtype=object)
+
+        # Only rows that have not been verified yet go through the agents
+        new_leads = _unprocessed_leads(leads_df)
+        processed_idx = new_leads.index[:0]
+        if new_leads.empty:
+            logging.info("No new leads to process since the last run.")
+        else:
+            new_leads = await agent_a_verify_leads(new_leads)
+            new_leads = agent_b_outreach(new_leads)
+            # Rows with an unknown verification result stay blank in the sheet and are retried next run
+            processed = new_leads[new_leads['Email Verified'].notna()]
+            processed_idx = processed.index
+            leads_df.loc[processed_idx, STATUS_COLUMNS] = processed[STATUS_COLUMNS].astype(object)
+
+        # Cast the merged columns to categoricals so the campaign summary counts over integer codes
+        leads_df['Email Verified'] = leads_df['Email Verified'].astype(EMAIL_VERIFIED_DTYPE)
+        leads_df['Response Status'] = leads_df['Response Status'].astype(RESPONSE_STATUS_DTYPE)
+
+        # The sheet update and the LLM summary + SMTP send are independent, so overlap them
+        await asyncio.gather(
+            asyncio.to_thread(write_google_sheets, leads_df, processed_idx, STATUS_COLUMNS),
+            asyncio.to_thread(send_summary_email, leads_df))
         logging.info("Scheduled task completed successfully.")
     except Exception as e:
         logging.exception("Error occurred during the scheduled task execution.")
 
-scheduler = BlockingScheduler()
-scheduler.add_job(scheduled_task, 'interval', hours=SCHEDULER_INTERVAL_HOURS)
+scheduler = AsyncIOScheduler()
+# Never overlap runs: a slow tick coalesces missed runs into one instead of queueing duplicates
+scheduler.add_job(scheduled_task, 'interval', hours=SCHEDULER_INTERVAL_HOURS,
+                  max_instances=1, coalesce=True, misfire_grace_time=300)
 
-if __name__ == '__main__':
-    logging.info(f"Starting the scheduler for automated lead processing every {SCHEDULER_INTERVAL_HOURS} hours.")
+async def main():
+    """Starts the scheduler on the running event loop and keeps it alive."""
     scheduler.start()
+    await asyncio.Event().wait()
+
+if __name__ == '__main__':
+    logging.info("Starting the scheduler for automated lead processing every %s hours.", SCHEDULER_INTERVAL_HOURS)
+    asyncio.run(main())
   